@@ -1,41 +1,50 @@
 #!/usr/bin/env python3
 # src/build_compact_lists.py
 import re
-import yaml
 import argparse
-from collections import OrderedDict
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from slugify import slugify
-import requests_cache, requests
+from github_fetch import (
+    FETCH_WORKERS, GITHUB_API, fetch_json, fetch_text, install_http_cache,
+    save_etag_cache,
+)
 
-BLACKLIST = ['all.yml']
-GITHUB_API = "https://api.github.com/repos/ai-prompts/prompt-lists/contents/lists/"
+BLACKLIST = frozenset({'all.yml'})
+MD_BLOCK_NAME = "const allPromptDataMarkdown"
+MD_BLOCK_RE = re.compile(
+    r"(const\s+allPromptDataMarkdown\s*=\s*`)([\s\S]*?)(`;)",
+    re.MULTILINE
+)
 
-def fetch_json(url):
-    r = requests.get(url); r.raise_for_status(); return r.json()
+@functools.lru_cache(maxsize=None)
+def _slug(name):
+    return slugify(name).lower()
 
-def fetch_text(url):
-    r = requests.get(url); r.raise_for_status(); return r.text
-
-def parse_frontmatter(text):
+def split_frontmatter(text):
     if not text.startswith('---'):
-        return {}, text
-    parts = text.split('---', 2)
-    if len(parts) < 3:
-        return {}, text
-    _, fm, body = parts
-    return yaml.safe_load(fm) or {}, body
+        return None, text
+    end = text.find('\n---', 3)
+    if end < 0:
+        return None, text
+    return text[3:end], text[end + 4:]
 
 def extract_markdown_block(js_text):
     """
     Returns (prefix, md_block, suffix) where md_block is the raw lines
     between the backticks of allPromptDataMarkdown.
     """
-    pattern = re.compile(
-        r"(const\s+allPromptDataMarkdown\s*=\s*`)([\s\S]*?)(`;)",
-        re.MULTILINE
-    )
-    m = pattern.search(js_text)
+    # Plain scans for the common `const allPromptDataMarkdown = `...`;` form
+    start = js_text.find(MD_BLOCK_NAME)
+    if start >= 0:
+        tick1 = js_text.find('`', start)
+        tick2 = js_text.find('`;', tick1 + 1) if tick1 >= 0 else -1
+        between = js_text[start + len(MD_BLOCK_NAME):tick1]
+        if tick2 >= 0 and between.strip() == '=':
+            return js_text[start:tick1 + 1], js_text[tick1 + 1:tick2].strip(), '`;'
+    # Otherwise allow arbitrary whitespace around the declaration
+    m = MD_BLOCK_RE.search(js_text)
     if not m:
         raise RuntimeError("Couldn't find allPromptDataMarkdown block")
     return m.group(1), m.group(2).strip(), m.group(3)
@@ -46,54 +55,59 @@ def parse_clusters_md(md_block):
       ### key
       - terms: a, b, c
       - associates: x, y
-    into an OrderedDict(key -> {'terms':[], 'associates':[]})
+    into a dict(key -> {'terms':[], 'associates':[]}), in file order
     """
-    clusters = OrderedDict()
+    clusters = {}
     current = None
+    entry = None  # clusters[current], kept to avoid re-looking it up per line
     for line in md_block.splitlines():
         line = line.strip()
         if line.startswith("### "):
             current = line[4:].strip()
-            clusters[current] = {'terms': [], 'associates': []}
+            entry = clusters[current] = {'terms': [], 'associates': []}
         elif current and line.startswith("- terms:"):
             parts = line[len("- terms:"):].strip()
-            clusters[current]['terms'] = [t.strip() for t in parts.split(',') if t.strip()]
+            entry['terms'] = [t.strip() for t in parts.split(',') if t.strip()]
         elif current and line.startswith("- associates:"):
             parts = line[len("- associates:"):].strip()
-            clusters[current]['associates'] = [a.strip() for a in parts.split(',') if a.strip()]
+            entry['associates'] = [a.strip() for a in parts.split(',') if a.strip()]
     return clusters
 
 def fetch_yaml_clusters():
     """
-    Fetch every <cat>/<file>.yml, parse frontmatter+body,
+    Fetch every <cat>/<file>.yml, strip its frontmatter,
     return dict(conceptKey -> terms-list).
     """
-    requests_cache.install_cache(".cache", expire_after=3600)
-    cats = fetch_json(GITHUB_API)
-    new_clusters = {}
-    for c in cats:
-        if c['type'] != 'dir': continue
-        for f in fetch_json(c['url']):
-            name = f['name']
-            if not name.endswith('.yml') or any(b in name for b in BLACKLIST):
-                continue
-            raw = fetch_text(f['download_url'])
-            _, body = parse_frontmatter(raw)
-            key = slugify(name[:-4]).lower()
-            terms = [l.strip() for l in body.splitlines() if l.strip()]
+    install_http_cache()
+    cats = [c for c in fetch_json(GITHUB_API) if c['type'] == 'dir']
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as ex:
+        files = [
+            f
+            for listing in ex.map(fetch_json, [c['url'] for c in cats])
+            for f in listing
+            if f['name'].endswith('.yml') and f['name'] not in BLACKLIST
+        ]
+        raws = ex.map(fetch_text, [f['download_url'] for f in files])
+        new_clusters = {}
+        for f, raw in zip(files, raws):
+            # Only the body is used here, so skip loading the front matter
+            _, body = split_frontmatter(raw)
+            key = _slug(f['name'][:-4])
+            terms = list(filter(None, map(str.strip, body.splitlines())))
             new_clusters[key] = terms
+    save_etag_cache()
     return new_clusters
 
 def merge_clusters(old, new):
     """
-    old: OrderedDict of existing clusters with 'terms' + 'associates'
+    old: dict of existing clusters with 'terms' + 'associates'
     new: dict(key -> new term list)
-    Returns a new OrderedDict in which:
+    Returns a new dict (insertion-ordered) in which:
       - for key in new: use new[ key ] as .terms but keep old[ key ].associates
       - for key only in old: keep it unchanged
       - for key only in new: append at end (with empty associates)
     """
-    merged = OrderedDict()
+    merged = {}
     # First, all old keys
     for key, data in old.items():
         terms = new.get(key, data['terms'])
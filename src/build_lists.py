@@ -2,38 +2,195 @@
 # src/build_lists.py
 
 import argparse
+import functools
+import io
+import itertools
 import json
+import operator
+import os
+import re
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-import requests
-import requests_cache
 import yaml
 from slugify import slugify
 
-GITHUB_API    = "https://api.github.com/repos/ai-prompts/prompt-lists/contents/lists/"
-BLACKLIST     = ['all.yml']
+from github_fetch import (
+    FETCH_WORKERS, GITHUB_API, fetch_json, fetch_text, install_http_cache,
+    save_etag_cache,
+)
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BLACKLIST     = frozenset({'all.yml'})
 HERE          = Path(__file__).resolve().parent
 PROJECT_ROOT  = HERE.parent
 DEFAULT_BUILD = PROJECT_ROOT / "build"
 LOCAL_CACHE   = PROJECT_ROOT / ".cache" / "prompt-lists"
 LISTS_DIR     = LOCAL_CACHE / "lists"
 
-def fetch_json(url):
-    return requests.get(url).json()
+# Front matter `title:` lines that can be read without a YAML load
+TITLE_RE       = re.compile(r'^title:[ \t]*(.*?)[ \t\r]*$', re.MULTILINE)
+PLAIN_TITLE_RE = re.compile(r'[^\W\d_][^:#\n]*')
+YAML_WORDS     = frozenset({
+    'y', 'n', 'yes', 'no', 'true', 'false', 'on', 'off', 'null',
+})
+
+# UMD wrappers for the generated bundles; JSON payloads are streamed between them
+PREFIX_CWT = """/*!
+ * categoriesWithThings.js v1.0.0
+ * Auto-generated – do not edit.
+ *
+ * UMD module exporting `thingList`
+ *
+ * Exports
+ *   • thingList – an object of categories → lists
+ *
+ * Usage
+ *   AMD (RequireJS):
+ *     define(['categoriesWithThings'], function(api) {
+ *       console.log(api.thingList);
+ *     });
+ *
+ *   CommonJS / Node:
+ *     const { thingList } = require('categoriesWithThings');
+ *     console.log(thingList);
+ *
+ *   Browser global:
+ *     console.log(window.categoriesWithThings.thingList);
+ */
+(function (root, factory) {
+  if (typeof define === 'function' && define.amd) {
+    define([], factory);
+  } else if (typeof module === 'object' && module.exports) {
+    module.exports = factory();
+  } else {
+    root.categoriesWithThings = factory();
+  }
+}(typeof self !== 'undefined' ? self : this, function () {
+  const thingList = """
+
+SUFFIX_CWT = """;
+  return { thingList };
+}));
+"""
+
+PREFIX_TI = """/*!
+ * thingList.js v1.0.0
+ * Auto-generated – do not edit.
+ *
+ * UMD module exporting `thingList`
+ *
+ * Exports
+ *   • thingList – object mapping categories to their thing arrays
+ *
+ * Usage
+ *   AMD (RequireJS):
+ *     define(['thingList'], function(api) {
+ *       console.log(api.thingList);
+ *     });
+ *
+ *   CommonJS / Node:
+ *     const { thingList } = require('thingList');
+ *     console.log(thingList);
+ *
+ *   Browser global:
+ *     console.log(window.thingList);
+ */
+(function (root, factory) {
+  if (typeof define === 'function' && define.amd) {
+    define([], factory);
+  } else if (typeof module === 'object' && module.exports) {
+    module.exports = factory();
+  } else {
+    root.thingIndex = factory();
+  }
+}(typeof self !== 'undefined' ? self : this, function () {
+  const thingCategories = """
+
+MIDDLE_TI = """;
+  const thingKV         = """
+
+SUFFIX_TI = """;
+
+  function things(name) {
+    const id = thingKV[name.toLowerCase()];
+    return id !== undefined ? thingCategories[id] : null;
+  }
+
+  return { thingCategories, thingKV, things };
+}));
+"""
+
+@functools.lru_cache(maxsize=None)
+def _slug(name):
+    return slugify(name).lower()
+
+def dump_json(obj, f, pretty=False):
+    """Write obj as JSON straight into the binary file f, minified unless pretty."""
+    if orjson is not None:
+        opts = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            opts |= orjson.OPT_INDENT_2
+        f.write(orjson.dumps(obj, option=opts))
+        return
+    # stdlib json only writes text, so stream it through a wrapper on f
+    text = io.TextIOWrapper(f, encoding='utf-8', newline='\n')
+    if pretty:
+        json.dump(obj, text, ensure_ascii=False, indent=2)
+    else:
+        json.dump(obj, text, ensure_ascii=False, separators=(',', ':'))
+    text.flush()
+    text.detach()
+
+def split_front_matter(text):
+    """Split str or bytes into (front matter or None, body)."""
+    dashes, nl = (b'---', b'\n') if isinstance(text, bytes) else ('---', '\n')
+    if not text.startswith(dashes):
+        return None, text
+    end = text.find(nl + dashes, 3)
+    if end < 0:
+        return None, text
+    return text[3:end], text[end + 4:]
 
-def fetch_text(url):
-    return requests.get(url).text
+def _continues(fm, pos):
+    """True if the next non-blank, non-comment line after pos is indented."""
+    for line in fm[pos:].split('\n')[1:]:
+        stripped = line.strip()
+        if stripped and not stripped.startswith('#'):
+            return line[:1] in (' ', '\t')
+    return False
 
-def parse_front_matter_string(text):
-    if not text.startswith('---'):
-        return {}, text
-    parts = text.split('---', 2)
-    if len(parts) < 3:
-        return {}, text
-    _, fm, body = parts
-    meta = yaml.safe_load(fm) or {}
-    return meta, body
+def front_matter_title(fm, default=None):
+    """
+    Return the `title:` value of a front matter block, or default when
+    there is no title key (an explicit null title stays None, as with
+    meta.get('title', default)). Plain one-line titles are read directly;
+    anything YAML could interpret differently (quotes, colons, bools,
+    continuations) goes through the full loader.
+    """
+    if fm is None or 'title' not in fm:
+        return default
+    matches = list(TITLE_RE.finditer(fm))
+    # A repeated title key resolves to the last one in YAML; leave that to it
+    if len(matches) == 1:
+        m     = matches[0]
+        value = m.group(1)
+        if (PLAIN_TITLE_RE.fullmatch(value)
+                and value.lower() not in YAML_WORDS
+                and not _continues(fm, m.end())):
+            return value
+    meta = yaml.load(fm, Loader=_YamlLoader) or {}
+    return meta.get('title', default)
 
 def ensure_local_cache():
     if not LOCAL_CACHE.exists():
@@ -49,14 +206,32 @@ def ensure_local_cache():
 def get_categories(use_local):
     if use_local and LISTS_DIR.exists():
         # Only subfolders under lists/ are real categories
-        return [
-            {'type': 'dir', 'name': d.name}
-            for d in LISTS_DIR.iterdir() if d.is_dir()
-        ]
+        with os.scandir(LISTS_DIR) as it:
+            return [{'type': 'dir', 'name': e.name} for e in it if e.is_dir()]
     else:
-        requests_cache.install_cache('.cache', expire_after=3600)
+        install_http_cache()
         return fetch_json(GITHUB_API)
 
+def _parse_one(task):
+    cat, f, use_local = task
+    name = f.name if use_local else f['name']
+    slug = _slug(name[:-4])
+
+    if use_local:
+        # Split the raw bytes first, then decode each part once. Line
+        # endings are normalised as read_text()'s universal newlines did
+        raw = Path(f).read_bytes()
+        if b'\r' in raw:
+            raw = raw.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+        fm, body = split_front_matter(raw)
+        fm   = None if fm is None else fm.decode('utf-8')
+        body = body.decode('utf-8')
+    else:
+        fm, body = split_front_matter(fetch_text(f['download_url']))
+    title = front_matter_title(fm, slug)
+    items = list(filter(None, map(str.strip, body.splitlines())))
+    return cat, slug, title, items
+
 def build_data(use_local=True):
     if use_local:
         ensure_local_cache()
@@ -65,155 +240,85 @@ def build_data(use_local=True):
     cat_dict = {}
     rev_map  = {}
     cat_keys = []
+    tasks    = []
+    thing_categories = []
 
-    for c in cats:
-        if c['type'] != 'dir':
-            continue
-
-        cat     = c['name']
-        sub_dir = LISTS_DIR / cat if use_local else None
+    cats = [c for c in cats if c['type'] == 'dir']
 
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as ex:
         if use_local:
-            files = [
-                f for f in sub_dir.iterdir()
-                if f.suffix == '.yml' and f.name not in BLACKLIST
-            ]
+            # DirEntry carries the name and type, so no per-entry stat/Path
+            listings = []
+            for c in cats:
+                with os.scandir(LISTS_DIR / c['name']) as it:
+                    listings.append([
+                        e for e in it
+                        if e.name.endswith('.yml') and e.name not in BLACKLIST
+                    ])
         else:
-            api_files = fetch_json(c['url'])
-            files = [
-                f for f in api_files
-                if f['name'].endswith('.yml') and f['name'] not in BLACKLIST
+            # Fetch every category listing at once rather than one per loop
+            listings = [
+                [
+                    f for f in api_files
+                    if f['name'].endswith('.yml') and f['name'] not in BLACKLIST
+                ]
+                for api_files in ex.map(fetch_json, [c['url'] for c in cats])
             ]
 
-        for f in files:
-            name = f.name if use_local else f['name']
-            slug = slugify(name[:-4]).lower()
-            key  = f"{cat}.{slug}"
+        for c, files in zip(cats, listings):
+            tasks.extend((c['name'], f, use_local) for f in files)
+
+        # Overlap the per-file reads (local) or downloads (remote) across threads
+        results = list(ex.map(_parse_one, tasks))
+
+    if not use_local:
+        save_etag_cache()
 
-            raw = (Path(f).read_text(encoding='utf-8')
-                   if use_local else
-                   fetch_text(f['download_url']))
+    # Sort so output ordering doesn't depend on directory or thread order
+    results.sort(key=lambda r: (r[0], r[1]))
 
-            meta, body = parse_front_matter_string(raw)
-            items = [ln.strip() for ln in body.splitlines() if ln.strip()]
+    # Results are grouped by category, so bind each category's map once
+    for cat, group in itertools.groupby(results, key=operator.itemgetter(0)):
+        sub_map = cat_dict[cat] = {}
+        prefix  = cat + '.'
 
-            cat_dict.setdefault(cat, {})[slug] = {
-                'title':    meta.get('title', slug),
+        for _, slug, title, items in group:
+            sub_map[slug] = {
+                'title':    title,
                 'category': cat,
                 'list':     items
             }
+            # Built alongside cat_keys so rev_map indices line up with it
+            thing_categories.append({'title': title, 'category': cat})
 
             idx = len(cat_keys)
-            cat_keys.append(key)
-            for it in items:
-                rev_map[it.lower()] = idx
-
-    thing_categories = [
-        {'title': cat_dict[c][s]['title'], 'category': c}
-        for c, subs in cat_dict.items()
-        for s in subs
-    ]
+            cat_keys.append(prefix + slug)
+            rev_map.update(zip(map(str.lower, items), itertools.repeat(idx)))
 
     if not cat_dict:
         print("⚠️  No categories found—check your cache or API response.")
 
     return cat_dict, thing_categories, rev_map
 
-def write_js(base, cat_dict, thing_categories, rev_map):
+def write_js(base, cat_dict, thing_categories, rev_map, pretty=False):
     js_dir = Path(base) / "js"
     js_dir.mkdir(parents=True, exist_ok=True)
 
-    # Pre-serialize JSON for consistent formatting
-    tl_json = json.dumps(cat_dict, ensure_ascii=False, indent=2)
-    tc_json = json.dumps(thing_categories, ensure_ascii=False, indent=2)
-    kv_json = json.dumps(rev_map, ensure_ascii=False, indent=2)
-
     # 1) categoriesWithThings.js
     out1 = js_dir / "categoriesWithThings.js"
-    with open(out1, "w", encoding="utf-8") as f:
-        f.write(
-f"""/*!
- * categoriesWithThings.js v1.0.0
- * Auto-generated – do not edit.
- *
- * UMD module exporting `thingList`
- *
- * Exports
- *   • thingList – an object of categories → lists
- *
- * Usage
- *   AMD (RequireJS):
- *     define(['categoriesWithThings'], function(api) {{
- *       console.log(api.thingList);
- *     }});
- *
- *   CommonJS / Node:
- *     const {{ thingList }} = require('categoriesWithThings');
- *     console.log(thingList);
- *
- *   Browser global:
- *     console.log(window.categoriesWithThings.thingList);
- */
-(function (root, factory) {{
-  if (typeof define === 'function' && define.amd) {{
-    define([], factory);
-  }} else if (typeof module === 'object' && module.exports) {{
-    module.exports = factory();
-  }} else {{
-    root.categoriesWithThings = factory();
-  }}
-}}(typeof self !== 'undefined' ? self : this, function () {{
-  const thingList = {tl_json};
-  return {{ thingList }};
-}}));
-""")
+    with open(out1, "wb") as f:
+        f.write(PREFIX_CWT.encode('utf-8'))
+        dump_json(cat_dict, f, pretty)
+        f.write(SUFFIX_CWT.encode('utf-8'))
 
     # 2) thingIndex.js
     out2 = js_dir / "thingIndex.js"
-    with open(out2, "w", encoding="utf-8") as f:
-        f.write(
-f"""/*!
- * thingList.js v1.0.0
- * Auto-generated – do not edit.
- *
- * UMD module exporting `thingList`
- *
- * Exports
- *   • thingList – object mapping categories to their thing arrays
- *
- * Usage
- *   AMD (RequireJS):
- *     define(['thingList'], function(api) {{
- *       console.log(api.thingList);
- *     }});
- *
- *   CommonJS / Node:
- *     const {{ thingList }} = require('thingList');
- *     console.log(thingList);
- *
- *   Browser global:
- *     console.log(window.thingList);
- */
-(function (root, factory) {{
-  if (typeof define === 'function' && define.amd) {{
-    define([], factory);
-  }} else if (typeof module === 'object' && module.exports) {{
-    module.exports = factory();
-  }} else {{
-    root.thingIndex = factory();
-  }}
-}}(typeof self !== 'undefined' ? self : this, function () {{
-  const thingCategories = {tc_json};
-  const thingKV         = {kv_json};
-
-  function things(name) {{
-    const id = thingKV[name.toLowerCase()];
-    return id !== undefined ? thingCategories[id] : null;
-  }}
-
-  return {{ thingCategories, thingKV, things }};
-}}));
-""")
+    with open(out2, "wb") as f:
+        f.write(PREFIX_TI.encode('utf-8'))
+        dump_json(thing_categories, f, pretty)
+        f.write(MIDDLE_TI.encode('utf-8'))
+        dump_json(rev_map, f, pretty)
+        f.write(SUFFIX_TI.encode('utf-8'))
 
     print(f"✅ Wrote UMD bundles to:\n  • {out1}\n  • {out2}")
 
@@ -230,10 +335,14 @@ def parse_args():
         "--no-local", action="store_true",
         help="Skip local .cache and always fetch from GitHub API"
     )
+    p.add_argument(
+        "--pretty", action="store_true",
+        help="Indent the embedded JSON instead of writing it minified"
+    )
     return p.parse_args()
 
 if __name__ == "__main__":
     args = parse_args()
     out_dir = Path(args.output_dir).resolve()
     cat_dict, thing_categories, rev_map = build_data(use_local=not args.no_local)
-    write_js(out_dir, cat_dict, thing_categories, rev_map)
+    write_js(out_dir, cat_dict, thing_categories, rev_map, pretty=args.pretty)
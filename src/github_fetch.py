@@ -0,0 +1,89 @@
+# src/github_fetch.py
+#
+# GitHub fetch helpers shared by build_lists.py and the compact builder:
+# one pooled Session, requests_cache setup, and ETag revalidation.
+
+import json
+import os
+import threading
+from pathlib import Path
+
+import requests
+import requests_cache
+from requests.adapters import HTTPAdapter
+
+GITHUB_API    = "https://api.github.com/repos/ai-prompts/prompt-lists/contents/lists/"
+CACHE_DIR     = Path(__file__).resolve().parent.parent / ".cache"
+ETAG_CACHE    = CACHE_DIR / "github_etags.json"
+HTTP_CACHE    = CACHE_DIR / "reqcache"
+# Fetch threads; also the HTTP pool size so every thread keeps a connection
+FETCH_WORKERS = min(32, (os.cpu_count() or 1) * 2)
+
+_etags        = None
+_etags_lock   = threading.Lock()
+_session      = None
+_session_lock = threading.Lock()
+
+def install_http_cache():
+    # Filesystem backend: no SQLite write lock shared by the fetch threads
+    requests_cache.install_cache(
+        str(HTTP_CACHE), backend='filesystem', expire_after=3600
+    )
+
+def _etag_cache():
+    global _etags
+    with _etags_lock:
+        if _etags is None:
+            try:
+                _etags = json.loads(ETAG_CACHE.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                _etags = {}
+        return _etags
+
+def save_etag_cache():
+    if _etags is None:
+        return
+    ETAG_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    with _etags_lock:
+        ETAG_CACHE.write_text(json.dumps(_etags, ensure_ascii=False), encoding='utf-8')
+
+def http_session():
+    """
+    Shared Session so fetches reuse keep-alive connections. Created on
+    first use, after install_http_cache() has patched requests.Session.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.headers.update({'Accept': 'application/vnd.github+json'})
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=FETCH_WORKERS)
+            _session.mount('https://', adapter)
+        return _session
+
+def _fetch(url, as_json):
+    """
+    GET url, revalidating against the stored ETag so unchanged
+    listings and files come back as a bodiless 304.
+    """
+    etags   = _etag_cache()
+    entry   = etags.get(url)
+    headers = {'If-None-Match': entry['etag']} if entry else {}
+    r = http_session().get(url, headers=headers)
+    if r.status_code == 304:
+        if entry:
+            return entry['body']
+        raise RuntimeError(f"Got 304 Not Modified for {url} without a cached copy")
+    r.raise_for_status()
+    body = r.json() if as_json else r.text
+    etag = r.headers.get('ETag')
+    if etag:
+        with _etags_lock:
+            etags[url] = {'etag': etag, 'body': body}
+    return body
+
+def fetch_json(url):
+    return _fetch(url, as_json=True)
+
+def fetch_text(url):
+    return _fetch(url, as_json=False)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The build scripts live in src/ as standalone modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
@@ -0,0 +1,24 @@
+import build_compact_lists_UNFINISHED as compact
+
+API = {
+    compact.GITHUB_API: [{'type': 'dir', 'url': 'https://x/tools'}],
+    'https://x/tools': [
+        {'name': 'install.yml', 'download_url': 'https://x/install'},
+        {'name': 'all.yml', 'download_url': 'https://x/all'},
+        {'name': 'README.md', 'download_url': 'https://x/readme'},
+    ],
+}
+RAW = {
+    'https://x/install': '---\ntitle: Install\n---\nWrench\n',
+    'https://x/all': '---\ntitle: All\n---\nEverything\n',
+}
+
+
+def test_fetch_yaml_clusters_blacklist_is_exact(monkeypatch):
+    monkeypatch.setattr(compact, 'install_http_cache', lambda: None)
+    monkeypatch.setattr(compact, 'save_etag_cache', lambda: None)
+    monkeypatch.setattr(compact, 'fetch_json', API.__getitem__)
+    monkeypatch.setattr(compact, 'fetch_text', RAW.__getitem__)
+
+    # all.yml is dropped, but install.yml merely contains it and is kept
+    assert compact.fetch_yaml_clusters() == {'install': ['Wrench']}
@@ -0,0 +1,98 @@
+import pytest
+import yaml
+
+import build_lists
+from build_lists import _parse_one, front_matter_title, split_front_matter
+
+SLUG = "the-slug"
+
+
+def yaml_title(fm):
+    meta = yaml.safe_load(fm) or {}
+    return meta.get('title', SLUG)
+
+
+@pytest.mark.parametrize("fm", [
+    # plain
+    "title: All birds\n",
+    "\ntitle: Birds\ntags: [a]\n",
+    "subtitle: q\ntitle: Ok\n",
+    "title: Dog's life\n",
+    "title: A - B, c[1]\n",
+    "title: Émus # comment\n",
+    # quoted / special
+    'title: "Dogs: breeds"\n',
+    "title: 'q'\n",
+    "title: 2024\n",
+    "title: .inf\n",
+    # bool / null words
+    "title: yes\n",
+    "title: Off\n",
+    "title: NO\n",
+    "title: Null\n",
+    "title: ~\n",
+    "title:\n",
+    # continuation
+    "title: A\n  continued\n",
+    "title: Foo\n\n  bar\n",
+    "title: Foo\n  # note\ntags: x\n",
+    # duplicate key: YAML keeps the last
+    "title: First\ntitle: Second\n",
+    # no title key
+    "titles: x\n",
+])
+def test_front_matter_title_matches_yaml(fm):
+    got = front_matter_title(fm, SLUG)
+    ref = yaml_title(fm)
+    assert got == ref
+    assert type(got) is type(ref)
+
+
+def test_front_matter_title_crlf():
+    fm, body = split_front_matter(b"---\r\ntitle: Crlf list\r\n---\r\nOne\r\n")
+    fm = fm.decode('utf-8')
+    assert front_matter_title(fm, SLUG) == yaml_title(fm) == "Crlf list"
+
+
+@pytest.mark.parametrize("raw", [
+    b"---\ntitle: X\n---\nA\nB\n",
+    b"---\r\ntitle: X\r\n---\r\nA\r\nB\r\n",
+    b"---\rtitle: X\r---\rA\rB\r",
+])
+def test_parse_one_local_newlines(tmp_path, raw):
+    path = tmp_path / "things.yml"
+    path.write_bytes(raw)
+    assert _parse_one(("cat", path, True)) == ("cat", "things", "X", ["A", "B"])
+
+
+def test_front_matter_title_missing_front_matter():
+    assert front_matter_title(None, SLUG) == SLUG
+
+
+def test_build_data_orders_by_category_and_slug(tmp_path, monkeypatch):
+    lists = tmp_path / "lists"
+    for cat, name, text in [
+        ("place", "cities.yml", "---\ntitle: Cities\n---\nParis\nBlue jay\n"),
+        ("animal", "Dog_Breeds.yml", "---\ntitle: Dogs\n---\nPoodle\n"),
+        ("animal", "birds.yml", "---\ntitle: Birds\n---\nBlue Jay\nEmu\n"),
+        ("animal", "all.yml", "---\ntitle: All\n---\nPoodle\n"),
+    ]:
+        (lists / cat).mkdir(parents=True, exist_ok=True)
+        (lists / cat / name).write_text(text, encoding="utf-8")
+    monkeypatch.setattr(build_lists, "LOCAL_CACHE", tmp_path)
+    monkeypatch.setattr(build_lists, "LISTS_DIR", lists)
+
+    cat_dict, thing_categories, rev_map = build_lists.build_data(use_local=True)
+
+    assert list(cat_dict) == ["animal", "place"]
+    assert list(cat_dict["animal"]) == ["birds", "dog-breeds"]
+    assert thing_categories == [
+        {"title": "Birds", "category": "animal"},
+        {"title": "Dogs", "category": "animal"},
+        {"title": "Cities", "category": "place"},
+    ]
+    # rev_map indices resolve to the list each term came from; the last
+    # list containing a term wins, and all.yml is skipped
+    assert rev_map == {"blue jay": 2, "emu": 0, "poodle": 1, "paris": 2}
+    titles = {term: thing_categories[idx]["title"] for term, idx in rev_map.items()}
+    assert titles == {"blue jay": "Cities", "emu": "Birds", "poodle": "Dogs", "paris": "Cities"}
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+import github_fetch
+
+
+class StubResponse:
+    def __init__(self, status_code, text='', etag=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = {'ETag': etag} if etag else {}
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+
+class StubSession:
+    """Serves each URL once with an ETag, then 304 when it is sent back."""
+
+    def __init__(self, bodies):
+        self.bodies = bodies
+        self.calls = []
+
+    def get(self, url, headers=None):
+        self.calls.append((url, dict(headers or {})))
+        etag = f'"{url}-v1"'
+        if (headers or {}).get('If-None-Match') == etag:
+            return StubResponse(304)
+        return StubResponse(200, self.bodies[url], etag)
+
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    stub = StubSession({'https://x/list': '[{"name": "a.yml"}]', 'https://x/raw': 'A\nB\n'})
+    monkeypatch.setattr(github_fetch, 'ETAG_CACHE', tmp_path / 'etags.json')
+    monkeypatch.setattr(github_fetch, '_etags', None)
+    monkeypatch.setattr(github_fetch, '_session', stub)
+    return stub
+
+
+def test_second_fetch_revalidates_with_etag(session):
+    first = github_fetch.fetch_json('https://x/list')
+    second = github_fetch.fetch_json('https://x/list')
+
+    assert first == second == [{'name': 'a.yml'}]
+    assert session.calls == [
+        ('https://x/list', {}),
+        ('https://x/list', {'If-None-Match': '"https://x/list-v1"'}),
+    ]
+
+
+def test_etag_cache_persists_between_runs(session):
+    assert github_fetch.fetch_text('https://x/raw') == 'A\nB\n'
+    github_fetch.save_etag_cache()
+
+    # A fresh run loads the saved entry and serves the 304 from it
+    github_fetch._etags = None
+    assert github_fetch.fetch_text('https://x/raw') == 'A\nB\n'
+    assert session.calls[-1][1] == {'If-None-Match': '"https://x/raw-v1"'}
+    assert json.loads(github_fetch.ETAG_CACHE.read_text(encoding='utf-8')) == {
+        'https://x/raw': {'etag': '"https://x/raw-v1"', 'body': 'A\nB\n'},
+    }
+
+
+def test_304_without_cached_copy_raises(session, monkeypatch):
+    monkeypatch.setattr(session, 'get', lambda url, headers=None: StubResponse(304))
+    with pytest.raises(RuntimeError, match='304'):
+        github_fetch.fetch_json('https://x/list')